@@ -1,27 +1,292 @@
 import streamlit as st # type: ignore
+import atexit
+import bisect
 import json
-from datetime import datetime
+import logging
+import os
+import sys
+import threading
+import uuid
+from collections import Counter
+from datetime import date
 import pandas as pd # type: ignore
 
+try:
+    import orjson # type: ignore
+except ImportError:
+    orjson = None
+
+try:
+    import simdjson # type: ignore
+except ImportError:
+    simdjson = None
+
+logger = logging.getLogger(__name__)
+
+# Point this at a .feather file to store the library in Arrow Feather format;
+# an existing JSON file with the same name is migrated on first load
+STORAGE_FILE = "books_data.json"
+
+# Larger than the 8 KB default to cut syscalls on big libraries
+IO_BUFFER_SIZE = 64 * 1024
+
+# Seconds to wait after the last change before writing the library to disk
+SAVE_DELAY = 0.5
+
+# Seconds to wait before retrying a save that failed
+SAVE_RETRY_DELAY = 5
+
+# Pretty-print the storage file (slower, larger) when debugging by hand:
+#   streamlit run library_ui.py -- --pretty
+PRETTY_JSON = "--pretty" in sys.argv[1:]
+
+# Custom CSS for styling
+_CSS = """
+<style>
+    .main { background-color: #f5f5f5; }
+    .sidebar .sidebar-content { background-color: #e8f4f8; }
+    h1 { color: #2c3e50; }
+    h2 { color: #3498db; }
+    .book-card { 
+        padding: 15px; 
+        border-radius: 10px; 
+        box-shadow: 0 4px 8px rgba(0,0,0,0.1); 
+        margin-bottom: 15px; 
+        background-color: white;
+    }
+    .stats-card { 
+        padding: 15px; 
+        border-radius: 10px; 
+        background-color: #e3f2fd; 
+        margin-bottom: 15px;
+    }
+</style>
+"""
+
+BOOK_COLUMNS = ["title", "author", "year", "genre", "read", "added_date"]
+
+# Fields every book must have; the counters and title index read them directly
+BOOK_DEFAULTS = {"title": "", "author": "", "year": "", "genre": "", "read": False}
+
+# Columns stored as Arrow strings in Feather; hand-edited JSON may mix ints and strings
+FEATHER_STRING_COLUMNS = ["title", "author", "year", "genre", "added_date"]
+
 class BookCollection:
     """A class to manage a collection of books with Streamlit UI"""
     
-    def __init__(self):
-        self.storage_file = "books_data.json"
+    def __init__(self, storage_file=STORAGE_FILE):
+        self.storage_file = storage_file
+        self.use_feather = storage_file.endswith(".feather")
+        # One instance is shared by every browser session (see get_book_manager),
+        # so all reads and writes of the collection state go through this lock
+        self._lock = threading.RLock()
+        # Serializes file writes; never taken while holding _lock
+        self._write_lock = threading.Lock()
+        # Bumped on every change; keys cached search results
+        self.version = 0
+        self._dirty = False
+        self._save_timer = None
+        # Last background save failure, shown by the UI until a save succeeds
+        self.save_error = None
+        self._load()
+    
+    def _load(self):
+        """Read the storage file and rebuild everything derived from it"""
+        self._mtime = self._storage_mtime()
+        # Unique per load: version restarts at 0 in a new instance, but
+        # st.cache_data can outlive the cached BookCollection
+        self.load_token = uuid.uuid4().hex
+        # No Feather file yet means read_from_file falls back to the JSON file
+        migrating = self.use_feather and self._mtime is None
         self.book_list = self.read_from_file()
+        self._read_count = 0
+        self._genre_counts = Counter()
+        for book in self.book_list:
+            self._count_book(book, 1)
+        self._index_titles()
+        self._clear_views()
+        if migrating and self.book_list:
+            # Write the Feather file so the migration only happens once
+            self._mark_changed()
+    
+    def _storage_mtime(self):
+        """Modification time of the storage file, or None if it does not exist yet"""
+        try:
+            return os.stat(self.storage_file).st_mtime_ns
+        except FileNotFoundError:
+            return None
+    
+    def reload_if_changed(self):
+        """Re-read the storage file if it was edited outside the app"""
+        with self._lock:
+            # Unsaved changes win; the pending save will overwrite the file
+            if self._dirty or self._storage_mtime() == self._mtime:
+                return
+            self._load()
         
+    @property
+    def books_df(self):
+        """Columnar (DataFrame) view of the collection, rebuilt only after a change"""
+        with self._lock:
+            if self._books_df is None:
+                self._books_df = pd.DataFrame(self.book_list, columns=BOOK_COLUMNS)
+            return self._books_df
+    
+    @property
+    def titles(self):
+        """Book titles in collection order, rebuilt only after a change"""
+        with self._lock:
+            if self._titles is None:
+                self._titles = [book["title"] for book in self.book_list]
+            return self._titles
+    
+    def _build_search_blob(self):
+        """Pack every lowercased "title<US>author" into one newline-separated buffer"""
+        parts = []
+        self._search_starts = []
+        offset = 0
+        for book in self.book_list:
+            entry = (book["title"] + "\x1f" + book["author"]).lower().encode()
+            self._search_starts.append(offset)
+            parts.append(entry)
+            offset += len(entry) + 1
+        self._search_blob = b"\n".join(parts)
+    
     def read_from_file(self):
-        """Load books from JSON file"""
+        """Load books from the storage file"""
+        if not self.use_feather:
+            return self.read_json(self.storage_file)
+        if not os.path.exists(self.storage_file):
+            # One-time migration from the old JSON storage
+            return self.read_json(os.path.splitext(self.storage_file)[0] + ".json")
+        try:
+            records = pd.read_feather(self.storage_file).to_dict("records")
+        # Same as read_json: a missing or unreadable file loads as an empty library
+        except (FileNotFoundError, ValueError):
+            return []
+        books = []
+        for record in records:
+            # Null fields come back as NaN; drop optional ones such as
+            # added_date and fill the core fields with their defaults
+            book = {key: value for key, value in record.items() if not pd.isna(value)}
+            for key, default in BOOK_DEFAULTS.items():
+                book.setdefault(key, default)
+            books.append(book)
+        return books
+    
+    def read_json(self, path):
+        """Load books from a JSON file"""
         try:
-            with open(self.storage_file, "r") as file:
+            if simdjson is not None:
+                with open(path, "rb", buffering=IO_BUFFER_SIZE) as file:
+                    return simdjson.Parser().parse(file.read(), recursive=True)
+            if orjson is not None:
+                with open(path, "rb", buffering=IO_BUFFER_SIZE) as file:
+                    return orjson.loads(file.read())
+            with open(path, "r", buffering=IO_BUFFER_SIZE) as file:
                 return json.load(file)
-        except (FileNotFoundError, json.JSONDecodeError):
+        # All three parsers report malformed input as a ValueError
+        except (FileNotFoundError, ValueError):
             return []
     
-    def save_to_file(self):
-        """Save books to JSON file"""
-        with open(self.storage_file, "w") as file:
-            json.dump(self.book_list, file, indent=4)
+    def save_to_file(self, books):
+        """Save a snapshot of the books to the storage file, replacing it atomically"""
+        tmp_file = self.storage_file + ".tmp"
+        try:
+            if self.use_feather:
+                self._feather_frame(books).to_feather(tmp_file, compression="uncompressed")
+            elif orjson is not None:
+                option = orjson.OPT_INDENT_2 if PRETTY_JSON else 0
+                with open(tmp_file, "wb", buffering=IO_BUFFER_SIZE) as file:
+                    file.write(orjson.dumps(books, option=option))
+            else:
+                with open(tmp_file, "w", buffering=IO_BUFFER_SIZE) as file:
+                    if PRETTY_JSON:
+                        json.dump(books, file, indent=4)
+                    else:
+                        json.dump(books, file, separators=(",", ":"))
+            os.replace(tmp_file, self.storage_file)
+        except Exception:
+            if os.path.exists(tmp_file):
+                os.remove(tmp_file)
+            raise
+    
+    def _feather_frame(self, books):
+        """Build a DataFrame with a fixed schema so Arrow can write every column"""
+        df = pd.DataFrame(books)
+        for column in df.columns.intersection(FEATHER_STRING_COLUMNS):
+            df[column] = df[column].astype("string")
+        if "read" in df.columns:
+            df["read"] = df["read"].notna() & df["read"].astype(bool)
+        return df
+    
+    def flush(self):
+        """Write pending changes to disk now"""
+        with self._write_lock:
+            with self._lock:
+                if self._save_timer is not None:
+                    self._save_timer.cancel()
+                    self._save_timer = None
+                if not self._dirty:
+                    return
+                books = [dict(book) for book in self.book_list]
+                version = self.version
+            # Write without holding _lock so reruns and edits are not blocked
+            try:
+                self.save_to_file(books)
+            except Exception as error:
+                # Stay dirty and try again later
+                logger.exception("Could not save the library to %s", self.storage_file)
+                with self._lock:
+                    self.save_error = error
+                    # An edit made during the write has already rescheduled
+                    if self._save_timer is None:
+                        self._schedule_save(SAVE_RETRY_DELAY)
+                return
+            with self._lock:
+                self._mtime = self._storage_mtime()
+                # An edit made during the write has its own save scheduled
+                if self.version == version:
+                    self._dirty = False
+                    self.save_error = None
+    
+    def _index_titles(self):
+        """Map each lowercased title to its positions in book_list"""
+        self._title_index = {}
+        for position, book in enumerate(self.book_list):
+            self._title_index.setdefault(book["title"].lower(), []).append(position)
+    
+    def _count_book(self, book, step):
+        """Add (step=1) or remove (step=-1) a book from the running stats"""
+        if book["read"]:
+            self._read_count += step
+        genre = book["genre"]
+        self._genre_counts[genre] += step
+        if not self._genre_counts[genre]:
+            del self._genre_counts[genre]
+    
+    def _clear_views(self):
+        """Drop the derived views so they are rebuilt from book_list"""
+        self._books_df = None
+        self._search_blob = None
+        self._search_starts = []
+        self._titles = None
+        self.version += 1
+    
+    def _mark_changed(self):
+        """Drop derived views and schedule a save after the book list changes"""
+        self._clear_views()
+        self._dirty = True
+        self._schedule_save(SAVE_DELAY)
+    
+    def _schedule_save(self, delay):
+        """(Re)start the save timer; call with _lock held"""
+        # Debounce: each change pushes the save back, so a burst is written once
+        if self._save_timer is not None:
+            self._save_timer.cancel()
+        self._save_timer = threading.Timer(delay, self.flush)
+        self._save_timer.daemon = True
+        self._save_timer.start()
     
     def add_book(self, title, author, year, genre, read):
         """Add a new book to the collection"""
@@ -31,42 +296,79 @@ class BookCollection:
             "year": year,
             "genre": genre,
             "read": read,
-            "added_date": datetime.now().strftime("%Y-%m-%d")
+            "added_date": date.today().isoformat()
         }
-        self.book_list.append(new_book)
-        self.save_to_file()
+        with self._lock:
+            self.book_list.append(new_book)
+            self._count_book(new_book, 1)
+            self._title_index.setdefault(title.lower(), []).append(len(self.book_list) - 1)
+            self._mark_changed()
         st.success("Book added successfully!")
     
     def delete_book(self, title):
         """Remove a book from the collection"""
-        self.book_list = [book for book in self.book_list if book["title"].lower() != title.lower()]
-        self.save_to_file()
+        with self._lock:
+            positions = self._title_index.pop(title.lower(), [])
+            for position in reversed(positions):
+                self._count_book(self.book_list.pop(position), -1)
+            if positions:
+                # Later books shifted down, so their positions are stale
+                self._index_titles()
+                self._mark_changed()
         st.success("Book removed successfully!")
     
     def update_book(self, original_title, updated_data):
         """Update book details"""
-        for book in self.book_list:
-            if book["title"].lower() == original_title.lower():
-                book.update(updated_data)
-                self.save_to_file()
-                st.success("Book updated successfully!")
-                return True
-        return False
+        old_key = original_title.lower()
+        with self._lock:
+            positions = self._title_index.get(old_key)
+            if not positions:
+                return False
+            book = self.book_list[positions[0]]
+            self._count_book(book, -1)
+            book.update(updated_data)
+            self._count_book(book, 1)
+            new_key = book["title"].lower()
+            if new_key != old_key:
+                position = positions.pop(0)
+                if not positions:
+                    del self._title_index[old_key]
+                bisect.insort(self._title_index.setdefault(new_key, []), position)
+            self._mark_changed()
+        st.success("Book updated successfully!")
+        return True
     
     def search_books(self, search_term=""):
         """Search books by title or author"""
         if not search_term:
             return self.book_list
-        return [
-            book for book in self.book_list
-            if search_term.lower() in book["title"].lower() or 
-               search_term.lower() in book["author"].lower()
-        ]
+        needle = search_term.lower().encode()
+        if b"\n" in needle or b"\x1f" in needle:
+            return []
+        with self._lock:
+            if self._search_blob is None:
+                self._build_search_blob()
+            blob = self._search_blob
+            starts = self._search_starts
+            books = self.book_list
+            last = len(starts) - 1
+            results = []
+            # One C-level bytes.find scan over the whole library
+            pos = blob.find(needle)
+            while pos != -1:
+                position = bisect.bisect_right(starts, pos) - 1
+                results.append(books[position])
+                # Resume at the next book so each book is reported once
+                if position == last:
+                    break
+                pos = blob.find(needle, starts[position + 1])
+            return results
     
     def get_reading_stats(self):
         """Calculate reading statistics"""
-        total = len(self.book_list)
-        read = sum(1 for book in self.book_list if book["read"])
+        with self._lock:
+            total = len(self.book_list)
+            read = self._read_count
         unread = total - read
         return {
             "total": total,
@@ -77,11 +379,36 @@ class BookCollection:
     
     def get_genre_distribution(self):
         """Get genre distribution"""
-        genres = {}
-        for book in self.book_list:
-            genre = book["genre"]
-            genres[genre] = genres.get(genre, 0) + 1
-        return genres
+        with self._lock:
+            return dict(self._genre_counts)
+
+@st.cache_resource
+def get_book_manager():
+    """Load the collection once per server process and reuse it across reruns"""
+    book_manager = BookCollection()
+    # Runs once per cache fill, not per rerun. A rebuilt cache adds another
+    # hook, but every hook flushes the current instance, never a dropped one
+    atexit.register(_flush_library_at_exit)
+    return book_manager
+
+def _flush_library_at_exit():
+    """Write pending changes of the currently cached collection on shutdown"""
+    get_book_manager().flush()
+
+@st.cache_data(max_entries=128)
+def _cached_search(_book_manager, load_token, version, search_term):
+    """Search one version of a library; _book_manager itself is not hashed"""
+    return _book_manager.search_books(search_term)
+
+@st.cache_data(max_entries=16)
+def _build_stats_frames(read, unread, genre_counts):
+    """Build the Statistics page chart frames; genre_counts is a tuple of (genre, count)"""
+    progress_df = pd.DataFrame({
+        "Status": ["Read", "Unread"],
+        "Count": [read, unread]
+    }).set_index("Status")
+    genre_df = pd.DataFrame(list(genre_counts), columns=["Genre", "Count"]).set_index("Genre")
+    return progress_df, genre_df
 
 # Streamlit UI
 def main():
@@ -92,30 +419,12 @@ def main():
         initial_sidebar_state="expanded"
     )
     
-    # Custom CSS for styling
-    st.markdown("""
-    <style>
-        .main { background-color: #f5f5f5; }
-        .sidebar .sidebar-content { background-color: #e8f4f8; }
-        h1 { color: #2c3e50; }
-        h2 { color: #3498db; }
-        .book-card { 
-            padding: 15px; 
-            border-radius: 10px; 
-            box-shadow: 0 4px 8px rgba(0,0,0,0.1); 
-            margin-bottom: 15px; 
-            background-color: white;
-        }
-        .stats-card { 
-            padding: 15px; 
-            border-radius: 10px; 
-            background-color: #e3f2fd; 
-            margin-bottom: 15px;
-        }
-    </style>
-    """, unsafe_allow_html=True)
+    st.markdown(_CSS, unsafe_allow_html=True)
     
-    book_manager = BookCollection()
+    book_manager = get_book_manager()
+    book_manager.reload_if_changed()
+    if book_manager.save_error is not None:
+        st.error(f"Could not save your library: {book_manager.save_error}")
     
     st.title("📚 Personal Library Manager")
     st.markdown("---")
@@ -146,24 +455,16 @@ def main():
         if not book_manager.book_list:
             st.info("Your library is empty. Add some books to get started!")
         else:
-            cols = st.columns([3, 1, 1, 1, 1])
-            cols[0].subheader("Title")
-            cols[1].subheader("Author")
-            cols[2].subheader("Year")
-            cols[3].subheader("Genre")
-            cols[4].subheader("Status")
-            
-            for book in book_manager.book_list:
-                cols = st.columns([3, 1, 1, 1, 1])
-                cols[0].write(book["title"])
-                cols[1].write(book["author"])
-                cols[2].write(book["year"])
-                cols[3].write(book["genre"])
-                status = "✅ Read" if book["read"] else "📖 Unread"
-                cols[4].write(status)
-                
-                # Divider
-                st.markdown("---")
+            # One table widget instead of a row of columns per book
+            books_df = book_manager.books_df
+            table = pd.DataFrame({
+                "Title": books_df["title"],
+                "Author": books_df["author"],
+                "Year": books_df["year"],
+                "Genre": books_df["genre"],
+                "Status": books_df["read"].map({True: "✅ Read", False: "📖 Unread"})
+            })
+            st.dataframe(table, use_container_width=True, hide_index=True)
     
     # Add Book Page
     elif menu_option == "➕ Add Book":
@@ -193,7 +494,9 @@ def main():
         search_term = st.text_input("Search by title or author", "")
         
         if search_term:
-            results = book_manager.search_books(search_term)
+            results = _cached_search(
+                book_manager, book_manager.load_token, book_manager.version, search_term
+            )
             if results:
                 st.success(f"Found {len(results)} matching books:")
                 
@@ -215,7 +518,7 @@ def main():
         if not book_manager.book_list:
             st.info("Your library is empty. Add some books first!")
         else:
-            book_titles = [book["title"] for book in book_manager.book_list]
+            book_titles = book_manager.titles
             selected_title = st.selectbox("Select a book to edit", book_titles)
             
             selected_book = next(book for book in book_manager.book_list if book["title"] == selected_title)
@@ -247,7 +550,7 @@ def main():
         if not book_manager.book_list:
             st.info("Your library is empty. There are no books to delete!")
         else:
-            book_titles = [book["title"] for book in book_manager.book_list]
+            book_titles = book_manager.titles
             selected_title = st.selectbox("Select a book to delete", book_titles)
             
             if st.button("Delete Book", type="primary"):
@@ -268,22 +571,18 @@ def main():
         
         st.markdown("---")
         
+        progress_df, genre_df = _build_stats_frames(
+            stats["read"], stats["unread"], tuple(genre_dist.items())
+        )
+        
         # Reading Progress Chart (using Streamlit native)
         st.subheader("Reading Progress")
-        progress_data = pd.DataFrame({
-            "Status": ["Read", "Unread"],
-            "Count": [stats["read"], stats["unread"]]
-        })
-        st.bar_chart(progress_data.set_index("Status"))
+        st.bar_chart(progress_df)
         
         # Genre Distribution Chart (using Streamlit native)
         if genre_dist:
             st.subheader("Genre Distribution")
-            genre_df = pd.DataFrame({
-                "Genre": list(genre_dist.keys()),
-                "Count": list(genre_dist.values())
-            })
-            st.bar_chart(genre_df.set_index("Genre"))
+            st.bar_chart(genre_df)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file